@@ -0,0 +1,18 @@
+#! /usr/bin/env python
+"""Makes ../../resources importable as a module for the sibling libraries;
+the path is resolved only once, when this module is first imported.
+This file must stay next to simulation.py and utils.py, since the path is
+computed from its own location
+"""
+
+import os
+import sys
+
+__author__ = 'Javier Ochoa (uidj5418)'
+__version__ = 'See MKS'
+
+# make a reference to path: ../../resources as a module to import libraries
+path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+# insert path: "../../resources" (if not previously added)
+if path not in sys.path:
+    sys.path.insert(0, path)
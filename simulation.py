@@ -23,22 +23,136 @@ __all__ = [
 #=================================
 # Import BuildIn Python Libraries
 #=================================
-import sys
 import os
+import select
+import signal
 import subprocess
+import threading
+import time
 
 #======================
 # Utilities libraries
 #======================
 
 # make a reference to path: ../../resources as a module to import libraries
-path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-# insert path: "../../resources" (if not previously added)
-if path not in sys.path:
-    sys.path.insert(0, path)
+import _common_bootstrap  # noqa: F401
 
 from resources.keywords.logging_lib import RobotLoggerClass
 
+# ========================================================================================
+# ==                                                                                    ==
+# ==                              PROCESS WAIT HELPERS                                  ==
+# ==                                                                                    ==
+# ========================================================================================
+
+def _wait_popen(proc, timeout):
+    """waits for a process through the Popen API (poll-sleep loop), returns
+    its result code or None if the timeout expired
+    """
+    try:
+        return proc.wait(timeout)
+    except subprocess.TimeoutExpired:
+        return None
+
+def _wait_kqueue(proc, timeout):
+    """waits for a process exit event (EVFILT_PROC) on BSD/macOS, returns
+    its result code or None if the timeout expired
+    """
+    kq = select.kqueue()
+    try:
+        event = select.kevent(
+            proc.pid,
+            filter=select.KQ_FILTER_PROC,
+            flags=select.KQ_EV_ADD | select.KQ_EV_ONESHOT,
+            fflags=select.KQ_NOTE_EXIT)
+        if not kq.control([event], 1, timeout):
+            return None
+    except OSError:
+        # process already exited and reaped
+        return _wait_popen(proc, timeout)
+    finally:
+        kq.close()
+    return proc.wait()
+
+def _wait_pidfd(proc, timeout):
+    """waits for a process without busy polling: a pidfd (Linux) becomes
+    readable when the process exits; returns its result code or None if the
+    timeout expired. Falls back to Popen.wait when pidfds are not available
+    """
+    if proc.returncode is not None:
+        return proc.returncode
+    if not hasattr(os, 'pidfd_open'):
+        if hasattr(select, 'kqueue'):
+            return _wait_kqueue(proc, timeout)
+        return _wait_popen(proc, timeout)
+    try:
+        fd = os.pidfd_open(proc.pid)
+    except OSError:
+        # kernel without pidfd support (< 5.3) or process already reaped
+        return _wait_popen(proc, timeout)
+    try:
+        if proc.returncode is not None:
+            # reaped by the SIGCHLD handler before the pidfd was opened
+            return proc.returncode
+        poller = select.poll()
+        poller.register(fd, select.POLLIN)
+        if not poller.poll(timeout * 1000):
+            return None
+    finally:
+        os.close(fd)
+    # process exited, reap it
+    return proc.wait()
+
+def _wait_pidfds(procs, timeout):
+    """waits for several processes at once with a single epoll instance
+    watching all their pidfds; returns a dictionary {proc: result code} with
+    None for the processes which did not exit before the timeout
+    """
+    results = dict.fromkeys(procs)
+    deadline = time.monotonic() + timeout
+    if not (hasattr(select, 'epoll') and hasattr(os, 'pidfd_open')):
+        for proc in procs:
+            results[proc] = _wait_pidfd(proc, max(0, deadline - time.monotonic()))
+        return results
+    pidfds = {}
+    unwatched = []
+    epoll = select.epoll()
+    try:
+        for proc in procs:
+            if proc.returncode is not None:
+                results[proc] = proc.returncode
+                continue
+            try:
+                fd = os.pidfd_open(proc.pid)
+            except OSError:
+                # kernel without pidfd support (< 5.3) or process already reaped
+                unwatched.append(proc)
+                continue
+            if proc.returncode is not None:
+                # reaped by the SIGCHLD handler before the pidfd was opened
+                os.close(fd)
+                results[proc] = proc.returncode
+                continue
+            pidfds[fd] = proc
+            epoll.register(fd, select.EPOLLIN)
+        while pidfds:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            for fd, _ in epoll.poll(remaining):
+                epoll.unregister(fd)
+                os.close(fd)
+                proc = pidfds.pop(fd)
+                # process exited, reap it
+                results[proc] = proc.wait()
+    finally:
+        epoll.close()
+        for fd in pidfds:
+            os.close(fd)
+    for proc in unwatched:
+        results[proc] = _wait_popen(proc, max(0, deadline - time.monotonic()))
+    return results
+
 # ========================================================================================
 # ==                                                                                    ==
 # ==                             GLOBAL SIMULATION CLASSES                              ==
@@ -58,6 +172,8 @@ class ProcessManager:
 
         # file extension for stdout argument for process execution
         _STD_FILE_EXT = '.log'
+        # seconds to wait for a terminated process before killing it
+        _STOP_TIMEOUT = 20
 
         def __init__(self, filename, id, workingDirectory=None):
             """Process class constructor
@@ -66,7 +182,7 @@ class ProcessManager:
             self._id = id
             self._name = None
             self._workingDirectory = workingDirectory
-            self._stdFile = None
+            self._stdFd = None
             self._processHandler = None
             # validate if filename exists
             self.__validateFileName()
@@ -114,20 +230,36 @@ class ProcessManager:
             return self._processHandler
 
         def getStdFile(self):
-            """returns STD file handler object
+            """returns STD file descriptor
             """
-            return self._stdFile
+            return self._stdFd
+
+        def poll(self):
+            """reaps this process if it already exited (without blocking),
+            returns its result code or None while it is still running
+            """
+            return self._processHandler.poll()
 
         def start(self):
             """starts and executes the process
             """
             errorMsg = None
             try:
+                # own session: the whole process tree can be signaled as a group
+                # NOTE: keep this call free of preexec_fn, user, group and
+                # extra_groups arguments; without them CPython (>= 3.10) starts
+                # the child with vfork() instead of fork(), so the page tables
+                # of a big Robot process are not copied for every start.
+                # (posix_spawn is not usable here: it requires cwd=None,
+                # close_fds=False and start_new_session=False)
                 self._processHandler = subprocess.Popen(
-                    self.getFileName(),
+                    [self.getFileName()],
                     cwd=self.getWorkingDirectory(),
                     stdout=self.getStdFile(),
-                    stderr=self.getStdFile()
+                    stderr=self.getStdFile(),
+                    shell=False,
+                    close_fds=True,
+                    start_new_session=True
                 )
                 SimuLogger.info("Process \"{name}\" started: {handler}".format(
                     name = self.getName(),
@@ -136,41 +268,78 @@ class ProcessManager:
             except Exception as detail:
                 errorMsg = detail
                 self._processHandler = None
+                self.__closeStdFile()
             return errorMsg
 
         def stop(self):
             """stops this process execution and terminates it
             """
-            self._processHandler.terminate()
-            try:
-                processResult = self._processHandler.wait(20)
+            self.terminate()
+            self.finalize(_wait_pidfd(self._processHandler, ProcessManager.Process._STOP_TIMEOUT))
+
+        def terminate(self):
+            """requests this process to terminate without waiting for it
+            """
+            if os.name == 'posix':
+                self.__signalProcessGroup(signal.SIGTERM)
+            else:
+                self._processHandler.terminate()
+
+        def finalize(self, processResult):
+            """releases this process once terminate() was requested; a process
+            without result code (still running) is killed
+            """
+            if processResult is not None:
                 SimuLogger.info("Process \"{name}\" terminated with result code: {result}".format(
                     name = self.getName(),
                     result = processResult
                 ))
-            except subprocess.TimeoutExpired:
-                self._processHandler.kill()
-                SimuLogger.info("Process \"{name}\" killed".format(
-                    name=self.getName()
+            else:
+                if os.name == 'posix':
+                    self.__signalProcessGroup(signal.SIGKILL)
+                else:
+                    self._processHandler.kill()
+                # SIGKILL cannot be ignored: reap the process (no zombie left)
+                processResult = self._processHandler.wait()
+                SimuLogger.info("Process \"{name}\" killed with result code: {result}".format(
+                    name = self.getName(),
+                    result = processResult
                 ))
             del self._processHandler
+            # the child keeps its own copy of the std file descriptor
+            self.__closeStdFile()
+
+        def __signalProcessGroup(self, sig):
+            """sends a signal to the process group (session) of this process,
+            so child processes spawned by the simulation receive it as well
+            """
+            try:
+                # process was started as session leader: group ID == process ID;
+                # even if the leader was already reaped, its PID is not reused
+                # while the group still has members
+                os.killpg(self._processHandler.pid, sig)
+            except ProcessLookupError:
+                # the whole process group already exited
+                pass
 
         def __validateFileName(self):
             """check if process filename exists
             """
-            if not os.path.exists(self._filename):
+            self._filename = os.path.normpath(self._filename)
+            try:
+                os.stat(self._filename)
+            except OSError:
                 raise FileNotFoundError("File does not exists: \"{f}\"".format(f=self._filename))
-            else:
-                self._filename = os.path.normpath(self._filename)
-                self._name = os.path.basename(self._filename)
+            self._name = os.path.basename(self._filename)
 
         def __validateWorkingDirectory(self):
             """check if the working directory in which the process will run exists
             """
-            if not os.path.exists(self._workingDirectory):
+            self._workingDirectory = os.path.normpath(self._workingDirectory)
+            try:
+                os.stat(self._workingDirectory)
+            except OSError:
                 raise FileNotFoundError("Working directory does not exists: \"{f}\"".format(f=self._workingDirectory))
-            else:
-                self._workingDirectory = os.path.normpath(self._workingDirectory)
 
         def __configureStdFile(self):
             """builds a filename from process name for std file purposes
@@ -181,14 +350,27 @@ class ProcessManager:
             # build std filename with .log extension
             std_filename = os.path.normpath( os.path.join(
                 self.getWorkingDirectory(), (name + ProcessManager.Process._STD_FILE_EXT)))
-            # create std file on working directory path
-            self._stdFile = open(std_filename, 'w')
+            # create std file on working directory path; a raw descriptor is
+            # enough since only the child process writes into it
+            self._stdFd = os.open(
+                std_filename,
+                os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_CLOEXEC', 0),
+                0o644)
+
+        def __closeStdFile(self):
+            """closes the std file descriptor of this process (if opened)
+            """
+            if self._stdFd is not None:
+                os.close(self._stdFd)
+                self._stdFd = None
 
     def __init__(self):
         """Process Manager constructor
         """
         self.init = True
         self.processContainer = {}
+        # SIGCHLD handler is installed with the first started process
+        self._childHandlerInstalled = False
 
     def getAllProcesses(self):
         """Returns a dictionary with all the current processes contained
@@ -207,6 +389,11 @@ class ProcessManager:
             self._startProcess(process)
             # load the started process into the container
             self.processContainer[process.getId()] = process
+            # reap crashed processes as soon as they exit
+            self._installChildHandler()
+            # the process may have exited before it was in the container, so
+            # the handler may already have missed its SIGCHLD
+            process.poll()
         except Exception as detail:
             errorMsg = detail
         return process, errorMsg
@@ -215,9 +402,9 @@ class ProcessManager:
         """Stop a process by searching the ID in the container
         """
         errorMsg = None
-        # check if processID exists on the container
-        if id in self.processContainer.keys():
-            process = self.processContainer.pop(id)
+        # take the process out of the container (if the process ID exists)
+        process = self.processContainer.pop(id, None)
+        if process is not None:
             process.stop()
         else:
             errorMsg = "No process ID with name: \"{name}\"".format(name=id)
@@ -228,14 +415,47 @@ class ProcessManager:
         """
         errorMsg = None
         # check if there is any process in the container
-        if self.getAllProcesses():
-            for process in list(self.processContainer.values()):
-                process.stop()
-            self.processContainer.clear()
+        if self.processContainer:
+            # drain the container requesting all processes to terminate first,
+            # then wait for all of them at once, so the timeout is paid once
+            # and not per process
+            processes = {}
+            while self.processContainer:
+                _, process = self.processContainer.popitem()
+                process.terminate()
+                processes[process.getProcessHandler()] = process
+            results = _wait_pidfds(processes, ProcessManager.Process._STOP_TIMEOUT)
+            for handler, process in processes.items():
+                process.finalize(results[handler])
         else:
             errorMsg = "There is no simulation process currently running to be stopped"
         return errorMsg
 
+    def _installChildHandler(self):
+        """installs a SIGCHLD handler which reaps the processes of the container
+        when they exit, so crashed processes do not remain as zombies until
+        they are stopped; processes started by other libraries are not touched
+        """
+        if self._childHandlerInstalled:
+            return
+        # signal handlers can only be installed from the main thread
+        if not hasattr(signal, 'SIGCHLD') or threading.current_thread() is not threading.main_thread():
+            return
+        self._childHandlerInstalled = True
+        previousHandler = signal.getsignal(signal.SIGCHLD)
+        if previousHandler is signal.SIG_IGN:
+            # children are already reaped by the system
+            return
+
+        def onChildExit(signum, frame):
+            for process in list(self.processContainer.values()):
+                process.poll()
+            # keep any handler installed before this one working
+            if callable(previousHandler):
+                previousHandler(signum, frame)
+
+        signal.signal(signal.SIGCHLD, onChildExit)
+
     def _getProcessFromFileName(self, filename, id, workingDirectory):
         """creates a new process if all arguments and returns the process object
         """
@@ -3,15 +3,9 @@
 """
 
 import datetime
-import re
-import os
-import sys
 
 # make a reference to path: ../../resources as a module to import libraries
-path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-# insert path: "../../resources" (if not previously added)
-if path not in sys.path:
-    sys.path.insert(0, path)
+import _common_bootstrap  # noqa: F401
 
 __author__ = 'Javier Ochoa (uidj5418)'
 __version__ = 'See MKS'
@@ -32,15 +26,26 @@ __all__ = [
 # ================================================
 # ==             COMMON UTILITIES               ==
 # ================================================
+# accepted strings for boolean conversion
+_TRUE_STRINGS = frozenset(['True', 'true', 'Yes', 'yes', '1'])
+_FALSE_STRINGS = frozenset(['False', 'false', 'No', 'no', '0'])
+
+# strftime formats for get_datetime
+# FLAT FORMAT: "22_04_2017__23_12_09"
+_FLAT_FMT = "%d_%m_%Y__%H_%M_%S"
+# NORMAL FORMAT: "22-04-2017 23:12:09"
+_NORMAL_FMT = "%d-%m-%Y %H:%M:%S"
+
 def str_to_bool(string):
     """Converts a string to a boolean state( True / False )
     """
     # check if string is already boolean type to avoid analysis
     if isinstance(string, bool):
         return string
-    elif string.strip() in ['True', 'true', 'Yes', 'yes']:
+    stripped = string.strip()
+    if stripped in _TRUE_STRINGS:
         return True
-    elif string.strip() in ['False', 'false', 'No', 'no']:
+    elif stripped in _FALSE_STRINGS:
         return False
     else:
         raise AssertionError("(str_to_bool) '{s}' is an invalid string for boolean conversion".format(s=string))
@@ -51,9 +56,9 @@ def str_to_bool(string):
 # ==============================
 def get_datetime(flat_format=False):
     """
-    Returns the current Datetime in flat format.
-    normal format example:
-    flat format example: 04_22_2017__24_12_09
+    Returns the current Datetime in normal or flat format.
+    normal format example: 22-04-2017 23:12:09
+    flat format example: 22_04_2017__23_12_09
 
     Parameters:
     - [flat_format] - Flag to return datetime in flat format
@@ -65,29 +70,7 @@ def get_datetime(flat_format=False):
     | ${date_time} = | get_datetime |
     | ${date_time} = | get_datetime | flat_format=True |
     """
-    date_time = None
+    # flag is usually a bool already, only strings need conversion
+    flag = flat_format if isinstance(flat_format, bool) else str_to_bool(flat_format)
     # get current time from computer
-    current_date = datetime.datetime.now()
-    # regular expression template to retrieve each component from datetime
-    RE_DATE_TEMPLATE = "(\d{4})-(\d{2})-(\d{2})\s{1}(\d{2}):(\d{2}):(\d{2})"
-    date_match = re.search(RE_DATE_TEMPLATE, str(current_date))
-    if date_match is not None:
-        if str_to_bool(flat_format):
-            # FLAT FORMAT: "04_22_2017__24_12_09"
-            date_time = "{day}_{month}_{year}__{hour}_{min}_{sec}".format(
-                day=date_match.group(3),
-                month=date_match.group(2),
-                year=date_match.group(1),
-                hour=date_match.group(4),
-                min=date_match.group(5),
-                sec=date_match.group(6))
-        else:
-            # NORMAL FORMAT: "2017-04-20 10:23:06"
-            date_time = "{day}-{month}-{year} {hour}:{min}:{sec}".format(
-                day=date_match.group(3),
-                month=date_match.group(2),
-                year=date_match.group(1),
-                hour=date_match.group(4),
-                min=date_match.group(5),
-                sec=date_match.group(6))
-    return date_time
+    return datetime.datetime.now().strftime(_FLAT_FMT if flag else _NORMAL_FMT)